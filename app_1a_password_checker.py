@@ -8,6 +8,16 @@ from zxcvbn import zxcvbn
 
 st.set_page_config(page_title="🔍 Password Strength Checker", page_icon="🔍")
 
+@st.cache_resource
+def get_matcher():
+    # Warm zxcvbn's matchers with one throwaway check per process
+    zxcvbn("warm-up")
+    return zxcvbn
+
+STRENGTH_LABELS = ("Very Weak", "Weak", "Fair", "Good", "Strong")
+STRENGTH_COLORS = ("🔴", "🟠", "🟡", "🔵", "🟢")
+STRENGTH_DISPLAY = tuple(f"{c} {l}" for c, l in zip(STRENGTH_COLORS, STRENGTH_LABELS))
+
 st.title("🔍 Password Strength Checker")
 st.write("Analyze your password security with advanced AI algorithms!")
 
@@ -20,21 +30,24 @@ st.sidebar.write("• Use unique passwords")
 
 st.header("Password Analysis")
 
-password = st.text_input("Enter password to check:", type="password")
+# Submit through a form so zxcvbn runs once per check instead of on every keystroke
+with st.form("pwd"):
+    password = st.text_input("Enter password to check:", type="password")
+    submitted = st.form_submit_button("🔍 Analyze")
 
-if password:
+if submitted and password:
     # Use zxcvbn for advanced password analysis
-    result = zxcvbn(password)
+    # (long inputs make zxcvbn super-linear, so only the first 100 chars are scored)
+    if len(password) > 100:
+        st.caption("Analyzing first 100 chars only")
+    result = get_matcher()(password[:100])
     
     score = result['score']
-    strength_labels = ["Very Weak", "Weak", "Fair", "Good", "Strong"]
-    strength_colors = ["🔴", "🟠", "🟡", "🔵", "🟢"]
-    
     col1, col2, col3 = st.columns(3)
     with col1:
         st.metric("Strength Score", f"{score}/4")
     with col2:
-        st.metric("Strength Level", f"{strength_colors[score]} {strength_labels[score]}")
+        st.metric("Strength Level", STRENGTH_DISPLAY[score])
     with col3:
         crack_time = result['crack_times_display']['offline_slow_hashing_1e4_per_second']
         st.metric("Time to Crack", crack_time)
@@ -10,6 +10,10 @@ from zxcvbn import zxcvbn
 
 st.set_page_config(page_title="🎲 Password Generator", page_icon="🎲")
 
+STRENGTH_LABELS = ("Very Weak", "Weak", "Fair", "Good", "Strong")
+STRENGTH_COLORS = ("🔴", "🟠", "🟡", "🔵", "🟢")
+STRENGTH_DISPLAY = tuple(f"{c} {l}" for c, l in zip(STRENGTH_COLORS, STRENGTH_LABELS))
+
 st.title("🎲 Secure Password Generator")
 st.write("Create unbreakable passwords with cryptographic security!")
 
@@ -77,9 +81,7 @@ if st.button("🎲 Generate Secure Passwords", type="primary"):
                 st.code(password, language=None)
             with col_b:
                 score = strength['score']
-                strength_labels = ["Very Weak", "Weak", "Fair", "Good", "Strong"]
-                strength_colors = ["🔴", "🟠", "🟡", "🔵", "🟢"]
-                st.write(f"{strength_colors[score]} {strength_labels[score]}")
+                st.write(STRENGTH_DISPLAY[score])
             
             # Detailed analysis for first password
             if i == 0:
@@ -120,14 +122,11 @@ for pwd, description in comparison_passwords:
     if st.button(f"Analyze: {description}", key=pwd):
         result = zxcvbn(pwd)
         score = result['score']
-        strength_labels = ["Very Weak", "Weak", "Fair", "Good", "Strong"]
-        strength_colors = ["🔴", "🟠", "🟡", "🔵", "🟢"]
-        
         col_a, col_b, col_c = st.columns(3)
         with col_a:
             st.code(pwd)
         with col_b:
-            st.write(f"**Strength:** {strength_colors[score]} {strength_labels[score]}")
+            st.write(f"**Strength:** {STRENGTH_DISPLAY[score]}")
         with col_c:
             crack_time = result['crack_times_display']['offline_slow_hashing_1e4_per_second']
             st.write(f"**Crack Time:** {crack_time}")
@@ -5,11 +5,54 @@ Check if your passwords have been found in known data breaches
 
 import streamlit as st
 import hashlib
+import binascii
 import requests
-import time
+import concurrent.futures
+from collections import Counter
 
 st.set_page_config(page_title="🕵️ Breach Checker", page_icon="🕵️")
 
+HIBP_RANGE_URL = "https://api.pwnedpasswords.com/range/{}"
+MAX_CONNECTIONS = 16
+MAX_BATCH_SIZE = 500
+
+@st.cache_resource
+def get_session():
+    # Keep-alive connection pool so repeated checks reuse the same TLS connection
+    session = requests.Session()
+    session.headers["User-Agent"] = "techsence-breach-checker"
+    # Pad range responses so their size doesn't leak which prefix was queried
+    session.headers["Add-Padding"] = "true"
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=MAX_CONNECTIONS)
+    session.mount("https://", adapter)
+    return session
+
+# Each range body is ~30KB, so 1024 entries caps the cache at roughly 30MB
+@st.cache_data(ttl=3600, max_entries=1024, show_spinner=False)
+def fetch_range(prefix):
+    """Fetch the raw HIBP range body (bytes) for one 5-char hash prefix"""
+    response = get_session().get(HIBP_RANGE_URL.format(prefix), timeout=5)
+    response.raise_for_status()
+    return response.content
+
+def sha1_upper(password):
+    """Uppercase hex SHA-1 of a password, as used by the HIBP range API"""
+    # HIBP is a lookup, not a security use; this skips the FIPS provider check
+    digest = hashlib.sha1(password.encode(), usedforsecurity=False).digest()
+    return binascii.hexlify(digest).upper().decode()
+
+def find_breach_count(range_body, suffix):
+    """Look up a hash suffix in a HIBP range body, returns None if absent"""
+    # Single C-level scan over the raw bytes, no decode or per-line split
+    key = suffix.encode() + b":"
+    idx = range_body.find(key)
+    if idx == -1 or (idx > 0 and range_body[idx - 1:idx] != b"\n"):
+        return None
+    end = range_body.find(b"\n", idx)
+    count = int(range_body[idx + len(key):end if end != -1 else None])
+    # Add-Padding decoys are returned with a zero count
+    return count or None
+
 st.title("🕵️ Data Breach Checker")
 st.write("Discover if your passwords have been compromised in data breaches!")
 
@@ -43,78 +86,66 @@ with col2:
 if single_check and check_password:
     with st.spinner("🔍 Checking breach databases..."):
         # Use SHA-1 hash for Have I Been Pwned API
-        sha1_hash = hashlib.sha1(check_password.encode()).hexdigest().upper()
+        sha1_hash = sha1_upper(check_password)
         prefix = sha1_hash[:5]
         suffix = sha1_hash[5:]
         
         try:
-            # Query Have I Been Pwned API
-            response = requests.get(f"https://api.pwnedpasswords.com/range/{prefix}")
+            # Query Have I Been Pwned API (ranges are cached per 5-char prefix)
+            breach_count = find_breach_count(fetch_range(prefix), suffix)
+            found = breach_count is not None
             
-            if response.status_code == 200:
-                hashes = response.text.splitlines()
-                found = False
-                breach_count = 0
-                
-                for hash_line in hashes:
-                    hash_suffix, count = hash_line.split(':')
-                    if hash_suffix == suffix:
-                        breach_count = int(count)
-                        found = True
-                        break
+            if found:
+                st.error(f"🚨 **BREACH DETECTED!**")
+                st.error(f"This password has been found in **{breach_count:,}** data breaches!")
                 
-                if found:
-                    st.error(f"🚨 **BREACH DETECTED!**")
-                    st.error(f"This password has been found in **{breach_count:,}** data breaches!")
-                    
-                    # Severity assessment
-                    if breach_count > 100000:
-                        severity = "🔴 EXTREMELY HIGH RISK"
-                        advice = "This password is extremely common and dangerous to use!"
-                    elif breach_count > 10000:
-                        severity = "🟠 HIGH RISK"
-                        advice = "This password is commonly known to attackers."
-                    elif breach_count > 1000:
-                        severity = "🟡 MEDIUM RISK"
-                        advice = "This password has been compromised multiple times."
-                    else:
-                        severity = "🔵 LOW RISK"
-                        advice = "While compromised, this password is less commonly known."
-                    
-                    col_a, col_b = st.columns(2)
-                    with col_a:
-                        st.metric("Risk Level", severity)
-                    with col_b:
-                        st.metric("Times Found", f"{breach_count:,}")
-                    
-                    st.warning(f"⚠️ **Security Advice:** {advice}")
-                    st.error("🚨 **Action Required:** Change this password immediately!")
-                    
-                    # Show breach timeline (simulated)
-                    with st.expander("📈 Breach History (Estimated)"):
-                        st.write("**Likely compromised in major breaches such as:**")
-                        breaches = [
-                            "Collection #1 (2019) - 772M emails",
-                            "LinkedIn (2012) - 164M accounts", 
-                            "Adobe (2013) - 153M accounts",
-                            "MySpace (2008) - 360M accounts",
-                            "Yahoo (2013-2014) - 3B accounts"
-                        ]
-                        for breach in breaches[:min(3, max(1, breach_count // 50000))]:
-                            st.write(f"• {breach}")
-                    
+                # Severity assessment
+                if breach_count > 100000:
+                    severity = "🔴 EXTREMELY HIGH RISK"
+                    advice = "This password is extremely common and dangerous to use!"
+                elif breach_count > 10000:
+                    severity = "🟠 HIGH RISK"
+                    advice = "This password is commonly known to attackers."
+                elif breach_count > 1000:
+                    severity = "🟡 MEDIUM RISK"
+                    advice = "This password has been compromised multiple times."
                 else:
-                    st.success("✅ **Good News!**")
-                    st.success("This password hasn't been found in known data breaches!")
-                    st.info("💡 However, still follow best practices:")
-                    st.write("• Use unique passwords for each account")
-                    st.write("• Enable two-factor authentication")
-                    st.write("• Consider using a password manager")
-                    st.write("• Regularly update important passwords")
-                    
+                    severity = "🔵 LOW RISK"
+                    advice = "While compromised, this password is less commonly known."
+                
+                col_a, col_b = st.columns(2)
+                with col_a:
+                    st.metric("Risk Level", severity)
+                with col_b:
+                    st.metric("Times Found", f"{breach_count:,}")
+                
+                st.warning(f"⚠️ **Security Advice:** {advice}")
+                st.error("🚨 **Action Required:** Change this password immediately!")
+                
+                # Show breach timeline (simulated)
+                with st.expander("📈 Breach History (Estimated)"):
+                    st.write("**Likely compromised in major breaches such as:**")
+                    breaches = [
+                        "Collection #1 (2019) - 772M emails",
+                        "LinkedIn (2012) - 164M accounts", 
+                        "Adobe (2013) - 153M accounts",
+                        "MySpace (2008) - 360M accounts",
+                        "Yahoo (2013-2014) - 3B accounts"
+                    ]
+                    for breach in breaches[:min(3, max(1, breach_count // 50000))]:
+                        st.write(f"• {breach}")
+                
             else:
-                st.error("❌ Unable to connect to breach database. Please try again later.")
+                st.success("✅ **Good News!**")
+                st.success("This password hasn't been found in known data breaches!")
+                st.info("💡 However, still follow best practices:")
+                st.write("• Use unique passwords for each account")
+                st.write("• Enable two-factor authentication")
+                st.write("• Consider using a password manager")
+                st.write("• Regularly update important passwords")
                 
+        except requests.exceptions.HTTPError:
+            st.error("❌ Unable to connect to breach database. Please try again later.")
         except requests.exceptions.RequestException:
             st.error("🌐 Network error. Please check your internet connection.")
         except Exception as e:
@@ -134,55 +165,56 @@ if st.session_state.get('show_batch', False):
     if st.button("🔍 Check All Passwords") and batch_passwords:
         passwords = [pwd.strip() for pwd in batch_passwords.split('\n') if pwd.strip()]
         
+        if len(passwords) > MAX_BATCH_SIZE:
+            st.warning(f"⚠️ Truncated to first {MAX_BATCH_SIZE} of {len(passwords)} passwords")
+            passwords = passwords[:MAX_BATCH_SIZE]
+        
         if passwords:
             progress_bar = st.progress(0)
-            results = []
+            # Hash and look up each distinct password once, then expand back in input order
+            unique = list(dict.fromkeys(passwords))
+            hashed = [(pwd, sha1_upper(pwd)) for pwd in unique]
+            results_by_pw = {}
             
-            for i, password in enumerate(passwords):
-                # Check each password
-                sha1_hash = hashlib.sha1(password.encode()).hexdigest().upper()
-                prefix = sha1_hash[:5]
-                suffix = sha1_hash[5:]
+            # Range lookups are pure network I/O, so run them concurrently
+            with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_CONNECTIONS) as executor:
+                futures = {
+                    executor.submit(fetch_range, sha1_hash[:5]): i
+                    for i, (_, sha1_hash) in enumerate(hashed)
+                }
                 
-                try:
-                    response = requests.get(f"https://api.pwnedpasswords.com/range/{prefix}")
+                for done, future in enumerate(concurrent.futures.as_completed(futures), 1):
+                    i = futures[future]
+                    password, sha1_hash = hashed[i]
+                    suffix = sha1_hash[5:]
                     
-                    if response.status_code == 200:
-                        hashes = response.text.splitlines()
-                        found = False
-                        breach_count = 0
-                        
-                        for hash_line in hashes:
-                            hash_suffix, count = hash_line.split(':')
-                            if hash_suffix == suffix:
-                                breach_count = int(count)
-                                found = True
-                                break
-                        
-                        results.append({
+                    try:
+                        breach_count = find_breach_count(future.result(), suffix)
+                        results_by_pw[password] = {
                             'password': password[:3] + '*' * (len(password) - 3),  # Mask for privacy
-                            'breached': found,
-                            'count': breach_count
-                        })
-                    
-                    # Rate limiting
-                    time.sleep(0.5)
+                            'breached': breach_count is not None,
+                            'count': breach_count or 0
+                        }
+                        
+                    except:
+                        results_by_pw[password] = {
+                            'password': password[:3] + '*' * (len(password) - 3),
+                            'breached': 'Error',
+                            'count': 0
+                        }
                     
-                except:
-                    results.append({
-                        'password': password[:3] + '*' * (len(password) - 3),
-                        'breached': 'Error',
-                        'count': 0
-                    })
-                
-                progress_bar.progress((i + 1) / len(passwords))
+                    progress_bar.progress(done / len(hashed))
+            
+            results = [results_by_pw[pwd] for pwd in passwords]
             
             # Display results
             st.subheader("📋 Batch Check Results")
             
-            safe_count = len([r for r in results if not r['breached']])
-            breached_count = len([r for r in results if r['breached'] and r['breached'] != 'Error'])
-            error_count = len([r for r in results if r['breached'] == 'Error'])
+            tally = Counter(
+                'error' if r['breached'] == 'Error' else 'breached' if r['breached'] else 'safe'
+                for r in results
+            )
+            safe_count, breached_count, error_count = tally['safe'], tally['breached'], tally['error']
             
             col_a, col_b, col_c = st.columns(3)
             with col_a:
@@ -4,10 +4,12 @@ Personal cybersecurity assessment and goal tracking
 """
 
 import streamlit as st
-import json
+import orjson
+import sqlite3
 from datetime import datetime
 import plotly.express as px
 import pandas as pd
+import numpy as np
 
 st.set_page_config(page_title="🏆 Security Dashboard", page_icon="🏆")
 
@@ -22,24 +24,280 @@ st.sidebar.write("• Personalized recommendations")
 st.sidebar.write("• Security habit tracking")
 
 # Data storage functions
-def load_security_data():
+DB_FILE = "security_dashboard.db"
+LEGACY_DATA_FILE = "security_dashboard_data.json"
+GOAL_COLUMNS = ("id", "title", "description", "category", "deadline",
+                "priority", "created_date", "completed", "progress")
+
+@st.cache_resource
+def get_connection():
+    conn = sqlite3.connect(DB_FILE, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS assessments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT,
+            total_score REAL,
+            responses_json TEXT,
+            category_scores_json TEXT
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS goals (
+            id INTEGER PRIMARY KEY,
+            title TEXT,
+            description TEXT,
+            category TEXT,
+            deadline TEXT,
+            priority TEXT,
+            created_date TEXT,
+            completed INTEGER,
+            progress INTEGER
+        )
+    """)
+    import_legacy_data(conn)
+    return conn
+
+def import_legacy_data(conn):
+    # One-time import of the old JSON file into a fresh database
+    has_rows = conn.execute(
+        "SELECT EXISTS(SELECT 1 FROM assessments) OR EXISTS(SELECT 1 FROM goals)"
+    ).fetchone()[0]
+    if has_rows:
+        return
     try:
-        with open("security_dashboard_data.json", "r") as f:
-            return json.load(f)
-    except:
-        return {
-            "assessments": [],
-            "goals": [],
+        with open(LEGACY_DATA_FILE, "rb") as f:
+            data = orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        return
+    
+    conn.execute("BEGIN")
+    for assessment in data.get("assessments", []):
+        insert_assessment(conn, assessment)
+    for goal in data.get("goals", []):
+        insert_goal(conn, goal)
+    conn.execute("COMMIT")
+
+def insert_assessment(conn, assessment):
+    conn.execute(
+        "INSERT INTO assessments (date, total_score, responses_json, category_scores_json) "
+        "VALUES (?, ?, ?, ?)",
+        (assessment["date"], float(assessment["total_score"]),
+         orjson.dumps(assessment["responses"]).decode(),
+         orjson.dumps(assessment["category_scores"], option=orjson.OPT_SERIALIZE_NUMPY).decode())
+    )
+
+def insert_goal(conn, goal):
+    # A goal without an id gets the next rowid from SQLite
+    cursor = conn.execute(
+        f"INSERT INTO goals ({', '.join(GOAL_COLUMNS)}) VALUES ({', '.join('?' * len(GOAL_COLUMNS))})",
+        tuple(goal.get(column) for column in GOAL_COLUMNS)
+    )
+    return cursor.lastrowid
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def load_score_history(last_id):
+    # last_id is only the cache key: any session's new assessment invalidates the cached frame
+    history = pd.read_sql_query(
+        "SELECT date, total_score FROM assessments ORDER BY id", get_connection()
+    )
+    history['date'] = pd.to_datetime(history['date']).dt.date
+    return history
+
+def latest_assessment_id():
+    # Read from the shared database, not session state, so other sessions' saves count
+    return get_connection().execute("SELECT MAX(id) FROM assessments").fetchone()[0]
+
+def load_security_data():
+    # Hydrate the working copy once per session; later changes write single rows
+    if "security_data" not in st.session_state:
+        conn = get_connection()
+        assessments = [
+            {
+                "date": date,
+                "total_score": total_score,
+                "responses": orjson.loads(responses_json),
+                "category_scores": orjson.loads(category_scores_json)
+            }
+            for date, total_score, responses_json, category_scores_json in conn.execute(
+                "SELECT date, total_score, responses_json, category_scores_json "
+                "FROM assessments ORDER BY id"
+            )
+        ]
+        goals = []
+        for row in conn.execute(f"SELECT {', '.join(GOAL_COLUMNS)} FROM goals ORDER BY id"):
+            goal = dict(zip(GOAL_COLUMNS, row))
+            goal["completed"] = bool(goal["completed"])
+            goals.append(goal)
+        
+        st.session_state["security_data"] = {
+            "assessments": assessments,
+            "goals": goals,
             "habits": [],
-            "last_assessment": None
+            "last_assessment": assessments[-1] if assessments else None
         }
+    return st.session_state["security_data"]
+
+def add_assessment(data, assessment):
+    insert_assessment(get_connection(), assessment)
+    data["assessments"].append(assessment)
+    data["last_assessment"] = assessment
 
-def save_security_data(data):
-    with open("security_dashboard_data.json", "w") as f:
-        json.dump(data, f, indent=2, default=str)
+def add_goal(data, goal):
+    goal["id"] = insert_goal(get_connection(), goal)
+    data["goals"].append(goal)
+
+def update_goal(goal):
+    get_connection().execute(
+        "UPDATE goals SET progress = ?, completed = ? WHERE id = ?",
+        (goal["progress"], goal["completed"], goal["id"])
+    )
 
 security_data = load_security_data()
 
+# Assessment questions
+QUESTIONS = (
+    {
+        "id": "unique_passwords",
+        "question": "Do you use unique passwords for each important account?",
+        "weight": 20,
+        "category": "Password Security"
+    },
+    {
+        "id": "password_manager",
+        "question": "Do you use a password manager?",
+        "weight": 15,
+        "category": "Password Security"
+    },
+    {
+        "id": "two_factor_auth",
+        "question": "Do you have 2FA enabled on important accounts (email, banking, social media)?",
+        "weight": 20,
+        "category": "Account Security"
+    },
+    {
+        "id": "software_updates",
+        "question": "Do you keep your software and operating system updated?",
+        "weight": 15,
+        "category": "System Security"
+    },
+    {
+        "id": "antivirus",
+        "question": "Do you have antivirus software installed and updated?",
+        "weight": 10,
+        "category": "System Security"
+    },
+    {
+        "id": "secure_browsing",
+        "question": "Do you avoid clicking suspicious links and downloading unknown files?",
+        "weight": 10,
+        "category": "Browsing Security"
+    },
+    {
+        "id": "wifi_security",
+        "question": "Do you avoid using public WiFi for sensitive activities?",
+        "weight": 5,
+        "category": "Network Security"
+    },
+    {
+        "id": "backup_strategy",
+        "question": "Do you have a regular backup strategy for important data?",
+        "weight": 5,
+        "category": "Data Protection"
+    }
+)
+
+# Score lookup tables, built once per process
+MAX_SCORE = sum(q["weight"] for q in QUESTIONS)
+CATEGORIES = tuple(dict.fromkeys(q["category"] for q in QUESTIONS))
+WEIGHTS = np.array([q["weight"] for q in QUESTIONS], dtype=np.float32)
+CAT_IDX = np.array([CATEGORIES.index(q["category"]) for q in QUESTIONS])
+RESPONSE_MULTIPLIERS = {"Yes": 1.0, "Partially": 0.5, "No": 0.0}
+
+# Goal suggestions for weak ("No"/"Partially") answers, by question id
+SUGGESTIONS = {
+    "unique_passwords": {
+        "title": "Implement Unique Passwords",
+        "description": "Create unique passwords for all important accounts",
+        "category": "Password Security"
+    },
+    "password_manager": {
+        "title": "Set Up Password Manager",
+        "description": "Research and install a reputable password manager",
+        "category": "Password Security"
+    },
+    "two_factor_auth": {
+        "title": "Enable 2FA on All Accounts",
+        "description": "Activate two-factor authentication on email, banking, and social media",
+        "category": "Account Security"
+    }
+}
+
+# Recommendations for "No" answers, by question id: (bucket, text)
+RECOMMENDATIONS = {
+    "two_factor_auth": ("priority", "🚨 **URGENT:** Enable two-factor authentication on all important accounts"),
+    "unique_passwords": ("priority", "🚨 **URGENT:** Stop reusing passwords across accounts"),
+    "password_manager": ("quick_win", "💡 **Quick Win:** Install and set up a password manager (1-2 hours)"),
+    "software_updates": ("quick_win", "💡 **Quick Win:** Enable automatic updates on all devices"),
+    "antivirus": ("quick_win", "💡 **Quick Win:** Install reputable antivirus software"),
+    "backup_strategy": ("long_term", "📅 **Long-term:** Set up automated backup system")
+}
+
+# Slider drags rerun only this fragment, not the whole dashboard
+@st.fragment
+def render_active_goals(goals):
+    active_goals = [goal for goal in goals if not goal["completed"]]
+    
+    for goal in active_goals:
+        with st.expander(f"🎯 {goal['title']} ({goal['priority']} Priority)"):
+            st.write(f"**Category:** {goal['category']}")
+            st.write(f"**Description:** {goal['description']}")
+            st.write(f"**Deadline:** {goal['deadline']}")
+            
+            # Progress tracker
+            current_progress = st.slider("Progress:", 0, 100, goal['progress'], 
+                                        key=f"goal_progress_{goal['id']}")
+            
+            if current_progress != goal['progress']:
+                goal['progress'] = current_progress
+                if current_progress >= 100:
+                    goal['completed'] = True
+                update_goal(goal)
+            
+            st.progress(current_progress / 100)
+            
+            if st.button(f"✅ Complete", key=f"complete_goal_{goal['id']}"):
+                goal['completed'] = True
+                goal['progress'] = 100
+                update_goal(goal)
+                st.success("🎉 Goal completed!")
+                st.rerun()
+
+# Chart builders, cached on their input frames so unchanged data skips plotly.express
+@st.cache_data(show_spinner=False)
+def category_score_chart(category_df):
+    fig = px.bar(category_df, x='Category', y='Score',
+                title='Security Score by Category',
+                color='Score',
+                color_continuous_scale='RdYlGn')
+    fig.update_layout(xaxis_tickangle=-45)
+    return fig
+
+@st.cache_data(show_spinner=False)
+def score_progress_chart(assessments_df):
+    fig = px.line(assessments_df, x='date', y='total_score',
+                 title='Security Score Progress Over Time',
+                 markers=True)
+    fig.update_yaxes(range=[0, 100])
+    return fig
+
+@st.cache_data(show_spinner=False)
+def goal_progress_chart(category_progress):
+    fig = px.bar(category_progress, x='category', y='progress',
+                title='Average Progress by Category')
+    fig.update_layout(xaxis_tickangle=-45)
+    return fig
+
 tab1, tab2, tab3, tab4 = st.tabs(["📊 Assessment", "🎯 Goals", "📈 Progress", "💡 Recommendations"])
 
 with tab1:
@@ -47,61 +305,9 @@ with tab1:
     
     st.write("Answer these questions to evaluate your current cybersecurity posture:")
     
-    # Assessment questions
-    questions = [
-        {
-            "id": "unique_passwords",
-            "question": "Do you use unique passwords for each important account?",
-            "weight": 20,
-            "category": "Password Security"
-        },
-        {
-            "id": "password_manager",
-            "question": "Do you use a password manager?",
-            "weight": 15,
-            "category": "Password Security"
-        },
-        {
-            "id": "two_factor_auth",
-            "question": "Do you have 2FA enabled on important accounts (email, banking, social media)?",
-            "weight": 20,
-            "category": "Account Security"
-        },
-        {
-            "id": "software_updates",
-            "question": "Do you keep your software and operating system updated?",
-            "weight": 15,
-            "category": "System Security"
-        },
-        {
-            "id": "antivirus",
-            "question": "Do you have antivirus software installed and updated?",
-            "weight": 10,
-            "category": "System Security"
-        },
-        {
-            "id": "secure_browsing",
-            "question": "Do you avoid clicking suspicious links and downloading unknown files?",
-            "weight": 10,
-            "category": "Browsing Security"
-        },
-        {
-            "id": "wifi_security",
-            "question": "Do you avoid using public WiFi for sensitive activities?",
-            "weight": 5,
-            "category": "Network Security"
-        },
-        {
-            "id": "backup_strategy",
-            "question": "Do you have a regular backup strategy for important data?",
-            "weight": 5,
-            "category": "Data Protection"
-        }
-    ]
-    
     # Display questions
     responses = {}
-    for q in questions:
+    for q in QUESTIONS:
         responses[q["id"]] = st.radio(
             f"**{q['question']}**",
             ["Yes", "Partially", "No"],
@@ -113,28 +319,19 @@ with tab1:
     
     if st.button("📊 Calculate Security Score", type="primary"):
         # Calculate score
-        total_score = 0
-        max_score = sum(q["weight"] for q in questions)
-        category_scores = {}
-        
-        for q in questions:
-            response = responses[q["id"]]
-            if response == "Yes":
-                score = q["weight"]
-            elif response == "Partially":
-                score = q["weight"] * 0.5
-            else:
-                score = 0
-            
-            total_score += score
-            
-            # Category tracking
-            if q["category"] not in category_scores:
-                category_scores[q["category"]] = {"score": 0, "max": 0}
-            category_scores[q["category"]]["score"] += score
-            category_scores[q["category"]]["max"] += q["weight"]
+        mults = np.array([RESPONSE_MULTIPLIERS[responses[q["id"]]] for q in QUESTIONS], dtype=np.float32)
+        scores = WEIGHTS * mults
+        total_score = float(scores.sum())
+        
+        # Category tracking
+        cat_scores = np.bincount(CAT_IDX, weights=scores, minlength=len(CATEGORIES))
+        cat_maxes = np.bincount(CAT_IDX, weights=WEIGHTS, minlength=len(CATEGORIES))
+        category_scores = {
+            category: {"score": float(score), "max": int(cat_max)}
+            for category, score, cat_max in zip(CATEGORIES, cat_scores, cat_maxes)
+        }
         
-        percentage_score = (total_score / max_score) * 100
+        percentage_score = (total_score / MAX_SCORE) * 100
         
         # Save assessment
         assessment = {
@@ -144,9 +341,7 @@ with tab1:
             "category_scores": category_scores
         }
         
-        security_data["assessments"].append(assessment)
-        security_data["last_assessment"] = assessment
-        save_security_data(security_data)
+        add_assessment(security_data, assessment)
         
         # Display results
         st.success("✅ Security Assessment Complete!")
@@ -186,11 +381,7 @@ with tab1:
         category_df = pd.DataFrame(category_df)
         
         # Visualization
-        fig = px.bar(category_df, x='Category', y='Score',
-                    title='Security Score by Category',
-                    color='Score',
-                    color_continuous_scale='RdYlGn')
-        fig.update_layout(xaxis_tickangle=-45)
+        fig = category_score_chart(category_df)
         st.plotly_chart(fig, use_container_width=True)
         
         # Display category details
@@ -225,7 +416,6 @@ with tab2:
         
         if st.button("🎯 Create Goal") and goal_title:
             goal = {
-                "id": len(security_data["goals"]),
                 "title": goal_title,
                 "description": goal_description,
                 "category": goal_category,
@@ -236,8 +426,7 @@ with tab2:
                 "progress": 0
             }
             
-            security_data["goals"].append(goal)
-            save_security_data(security_data)
+            add_goal(security_data, goal)
             st.success("✅ Security goal created!")
             st.rerun()
     
@@ -245,32 +434,7 @@ with tab2:
         st.subheader("📋 Active Goals")
         
         if security_data["goals"]:
-            active_goals = [goal for goal in security_data["goals"] if not goal["completed"]]
-            
-            for goal in active_goals:
-                with st.expander(f"🎯 {goal['title']} ({goal['priority']} Priority)"):
-                    st.write(f"**Category:** {goal['category']}")
-                    st.write(f"**Description:** {goal['description']}")
-                    st.write(f"**Deadline:** {goal['deadline']}")
-                    
-                    # Progress tracker
-                    current_progress = st.slider("Progress:", 0, 100, goal['progress'], 
-                                                key=f"goal_progress_{goal['id']}")
-                    
-                    if current_progress != goal['progress']:
-                        goal['progress'] = current_progress
-                        if current_progress >= 100:
-                            goal['completed'] = True
-                        save_security_data(security_data)
-                    
-                    st.progress(current_progress / 100)
-                    
-                    if st.button(f"✅ Complete", key=f"complete_goal_{goal['id']}"):
-                        goal['completed'] = True
-                        goal['progress'] = 100
-                        save_security_data(security_data)
-                        st.success("🎉 Goal completed!")
-                        st.rerun()
+            render_active_goals(security_data["goals"])
         else:
             st.info("No goals set yet. Create your first security goal!")
     
@@ -283,30 +447,12 @@ with tab2:
         
         # Generate suggestions based on weak areas
         for q_id, response in last_assessment["responses"].items():
-            if response in ["No", "Partially"]:
-                if q_id == "unique_passwords":
-                    suggestions.append({
-                        "title": "Implement Unique Passwords",
-                        "description": "Create unique passwords for all important accounts",
-                        "category": "Password Security"
-                    })
-                elif q_id == "password_manager":
-                    suggestions.append({
-                        "title": "Set Up Password Manager",
-                        "description": "Research and install a reputable password manager",
-                        "category": "Password Security"
-                    })
-                elif q_id == "two_factor_auth":
-                    suggestions.append({
-                        "title": "Enable 2FA on All Accounts",
-                        "description": "Activate two-factor authentication on email, banking, and social media",
-                        "category": "Account Security"
-                    })
+            if response in ("No", "Partially") and (suggestion := SUGGESTIONS.get(q_id)):
+                suggestions.append(suggestion)
         
         for suggestion in suggestions[:3]:  # Show top 3 suggestions
             if st.button(f"➕ Add Goal: {suggestion['title']}", key=f"suggest_{suggestion['title']}"):
                 goal = {
-                    "id": len(security_data["goals"]),
                     "title": suggestion['title'],
                     "description": suggestion['description'],
                     "category": suggestion['category'],
@@ -317,8 +463,7 @@ with tab2:
                     "progress": 0
                 }
                 
-                security_data["goals"].append(goal)
-                save_security_data(security_data)
+                add_goal(security_data, goal)
                 st.success("✅ Suggested goal added!")
                 st.rerun()
 
@@ -327,13 +472,9 @@ with tab3:
     
     if security_data["assessments"]:
         # Progress over time
-        assessments_df = pd.DataFrame(security_data["assessments"])
-        assessments_df['date'] = pd.to_datetime(assessments_df['date']).dt.date
+        assessments_df = load_score_history(latest_assessment_id())
         
-        fig = px.line(assessments_df, x='date', y='total_score',
-                     title='Security Score Progress Over Time',
-                     markers=True)
-        fig.update_yaxes(range=[0, 100])
+        fig = score_progress_chart(assessments_df)
         st.plotly_chart(fig, use_container_width=True)
         
         # Latest vs First comparison
@@ -378,9 +519,7 @@ with tab3:
         if not goals_df.empty:
             category_progress = goals_df.groupby('category')['progress'].mean().reset_index()
             
-            fig = px.bar(category_progress, x='category', y='progress',
-                        title='Average Progress by Category')
-            fig.update_layout(xaxis_tickangle=-45)
+            fig = goal_progress_chart(category_progress)
             st.plotly_chart(fig, use_container_width=True)
     
     else:
@@ -399,20 +538,11 @@ with tab4:
         quick_wins = []
         long_term_goals = []
         
+        buckets = {"priority": priority_actions, "quick_win": quick_wins, "long_term": long_term_goals}
         for q_id, response in last_assessment["responses"].items():
-            if response == "No":
-                if q_id == "two_factor_auth":
-                    priority_actions.append("🚨 **URGENT:** Enable two-factor authentication on all important accounts")
-                elif q_id == "unique_passwords":
-                    priority_actions.append("🚨 **URGENT:** Stop reusing passwords across accounts")
-                elif q_id == "password_manager":
-                    quick_wins.append("💡 **Quick Win:** Install and set up a password manager (1-2 hours)")
-                elif q_id == "software_updates":
-                    quick_wins.append("💡 **Quick Win:** Enable automatic updates on all devices")
-                elif q_id == "antivirus":
-                    quick_wins.append("💡 **Quick Win:** Install reputable antivirus software")
-                elif q_id == "backup_strategy":
-                    long_term_goals.append("📅 **Long-term:** Set up automated backup system")
+            if response == "No" and (recommendation := RECOMMENDATIONS.get(q_id)):
+                bucket, text = recommendation
+                buckets[bucket].append(text)
         
         # Display recommendations
         if priority_actions:
@@ -10,7 +10,10 @@ from transformers import pipeline
 import torch
 import plotly.express as px
 import pandas as pd
+import numpy as np
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import threading
 
 st.set_page_config(page_title="📊 AI Vision Analytics", page_icon="📊", layout="wide")
 
@@ -24,6 +27,11 @@ st.sidebar.write("• Comprehensive reporting")
 st.sidebar.write("• Visual insights")
 st.sidebar.write("• Performance comparison")
 
+# Half precision on GPU; TF32 for any matmuls still running in fp32
+DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+DTYPE = torch.float16 if DEVICE == "cuda" else torch.float32
+torch.set_float32_matmul_precision('high')
+
 @st.cache_resource
 def load_all_models():
     """Load all AI models with caching"""
@@ -31,68 +39,158 @@ def load_all_models():
     
     try:
         models['classifier'] = pipeline("image-classification", 
-                                      model="google/vit-base-patch16-224")
+                                      model="google/vit-base-patch16-224",
+                                      device=DEVICE,
+                                      torch_dtype=DTYPE)
+        if DEVICE == "cpu":
+            # int8 weights for the Linear layers that dominate ViT compute on CPU
+            models['classifier'].model = torch.ao.quantization.quantize_dynamic(
+                models['classifier'].model, {torch.nn.Linear}, dtype=torch.qint8
+            )
     except Exception as e:
         st.warning(f"Could not load classifier: {e}")
         models['classifier'] = None
     
     try:
         models['detector'] = pipeline("object-detection", 
-                                    model="facebook/detr-resnet-50")
+                                    model="facebook/detr-resnet-50",
+                                    device=DEVICE,
+                                    torch_dtype=DTYPE)
     except Exception as e:
         st.warning(f"Could not load detector: {e}")
         models['detector'] = None
     
     try:
         models['captioner'] = pipeline("image-to-text", 
-                                     model="nlpconnect/vit-gpt2-image-captioning")
+                                     model="nlpconnect/vit-gpt2-image-captioning",
+                                     device=DEVICE,
+                                     torch_dtype=DTYPE)
+        if DEVICE == "cuda":
+            # Fuse the fixed-shape ViT encoder and the GPT-2 decoder (dynamic, so the growing
+            # sequence doesn't recompile); no CUDA graphs since calls come from fresh pool threads
+            caption_model = models['captioner'].model
+            encoder, decoder = caption_model.encoder, caption_model.decoder
+            try:
+                caption_model.encoder = torch.compile(encoder, dynamic=False)
+                caption_model.decoder = torch.compile(decoder, dynamic=True)
+                with torch.inference_mode():
+                    caption_model.generate(torch.zeros(1, 3, 224, 224, device=DEVICE, dtype=DTYPE))
+            except Exception:
+                # No usable compiler backend (e.g. no Triton on Windows): keep the eager modules
+                caption_model.encoder, caption_model.decoder = encoder, decoder
     except Exception as e:
         st.warning(f"Could not load captioner: {e}")
         models['captioner'] = None
     
     return models
 
+@st.cache_resource
+def load_classifier_graph(_classifier):
+    """Record the classifier's batch-1 forward pass as a CUDA graph, or None if capture fails"""
+    try:
+        static_input = torch.zeros(1, 3, 224, 224, device=DEVICE, dtype=DTYPE)
+        
+        # Warm up on a side stream so lazy init and allocations stay out of the capture
+        stream = torch.cuda.Stream()
+        stream.wait_stream(torch.cuda.current_stream())
+        with torch.cuda.stream(stream), torch.inference_mode():
+            for _ in range(3):
+                _classifier.model(static_input)
+        torch.cuda.current_stream().wait_stream(stream)
+        
+        graph = torch.cuda.CUDAGraph()
+        with torch.inference_mode(), torch.cuda.graph(graph):
+            static_logits = _classifier.model(static_input).logits
+    except Exception:
+        # Cached as None so a failing capture isn't retried on every click
+        return None
+    return graph, static_input, static_logits, threading.Lock()
+
+def classify_with_graph(classifier, graph_state, image, top_k=5):
+    """Classify by replaying the captured graph, returns [{'label', 'score'}]"""
+    graph, static_input, static_logits, lock = graph_state
+    pixel_values = classifier.image_processor(image, return_tensors="pt").pixel_values
+    
+    # The static buffers are shared by every session
+    with lock, torch.inference_mode():
+        static_input.copy_(pixel_values)
+        graph.replay()
+        top = static_logits.float().softmax(-1).topk(top_k)
+    
+    return [
+        {'label': classifier.model.config.id2label[idx.item()], 'score': prob.item()}
+        for prob, idx in zip(top.values[0], top.indices[0])
+    ]
+
+def run_inference(model, image):
+    """Call a pipeline without autograd bookkeeping (inference mode is per thread)"""
+    with torch.inference_mode():
+        return model(image)
+
+TASK_NAMES = {'classification': "Classification", 'detection': "Detection", 'caption': "Captioning"}
+
 def perform_comprehensive_analysis(image, models):
     """Perform complete image analysis using all available models"""
     results = {}
     
     # Prepare image for processing
-    if image.size[0] > 800 or image.size[1] > 800:
-        image_processed = image.copy()
-        image_processed.thumbnail((800, 800))
+    w, h = image.size
+    if w > 800 or h > 800:
+        # One resize straight to the final size instead of a full-size copy plus thumbnail
+        scale = 800 / max(w, h)
+        image_processed = image.resize((max(1, round(w * scale)), max(1, round(h * scale))), Image.BILINEAR)
     else:
         image_processed = image
     
-    # Classification Analysis
-    if models['classifier']:
-        try:
-            classification_results = models['classifier'](image_processed)
-            results['classification'] = classification_results
-        except Exception as e:
-            st.error(f"Classification error: {e}")
-            results['classification'] = None
+    # Classifier and captioner are both 224x224 ViTs, so resize once for the pair
+    vit_image = image_processed.convert('RGB').resize((224, 224), Image.BILINEAR)
     
-    # Object Detection Analysis
-    if models['detector']:
-        try:
-            detection_results = models['detector'](image_processed)
-            results['detection'] = detection_results
-        except Exception as e:
-            st.error(f"Detection error: {e}")
-            results['detection'] = None
+    # Run the three models concurrently; torch releases the GIL inside its kernels
+    tasks = {}
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        # Replaying a captured graph skips per-kernel launch overhead at batch size 1
+        graph_state = load_classifier_graph(models['classifier']) if models['classifier'] and DEVICE == "cuda" else None
+        if graph_state:
+            tasks['classification'] = executor.submit(classify_with_graph, models['classifier'], graph_state, vit_image)
+        elif models['classifier']:
+            tasks['classification'] = executor.submit(run_inference, models['classifier'], vit_image)
+        if models['detector']:
+            tasks['detection'] = executor.submit(run_inference, models['detector'], image_processed)
+        if models['captioner']:
+            tasks['caption'] = executor.submit(run_inference, models['captioner'], vit_image)
     
-    # Caption Generation
-    if models['captioner']:
+    # Collect results and errors; the caller reports errors outside the cache
+    errors = {}
+    for task, future in tasks.items():
         try:
-            caption_results = models['captioner'](image_processed)
-            results['caption'] = caption_results[0]['generated_text'] if caption_results else None
+            output = future.result()
         except Exception as e:
-            st.error(f"Captioning error: {e}")
-            results['caption'] = None
+            errors[task] = str(e)
+            results[task] = None
+            continue
+        
+        if task == 'caption':
+            output = output[0]['generated_text'] if output else None
+        results[task] = output
     
-    return results
+    return results, errors
 
-def create_analysis_report(image, results):
+def detections_frame(detections):
+    """Detections as one table with box coordinates and area columns"""
+    # Built column-wise from arrays rather than one dict per row
+    boxes = np.array([[d['box']['xmin'], d['box']['ymin'], d['box']['xmax'], d['box']['ymax']]
+                      for d in detections], dtype=np.float32).reshape(-1, 4)
+    return pd.DataFrame({
+        'label': [d['label'] for d in detections],
+        'score': np.fromiter((d['score'] for d in detections), dtype=np.float32, count=len(detections)),
+        'xmin': boxes[:, 0],
+        'ymin': boxes[:, 1],
+        'xmax': boxes[:, 2],
+        'ymax': boxes[:, 3],
+        'area': (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    })
+
+def create_analysis_report(image, results, det_df=None):
     """Create comprehensive analysis report"""
     report = {
         'image_properties': {
@@ -122,18 +220,14 @@ def create_analysis_report(image, results):
         report['analysis_summary']['all_classifications'] = len(high_confidence_classes)
     
     # Process detection results
-    if results.get('detection'):
-        detections = results['detection']
-        report['analysis_summary']['objects_detected'] = len(detections)
+    if det_df is not None:
+        report['analysis_summary']['objects_detected'] = len(det_df)
         
         # Count objects by type
-        object_types = [d['label'] for d in detections]
-        report['object_counts'] = dict(Counter(object_types))
+        report['object_counts'] = det_df['label'].value_counts().to_dict()
         
         # Average detection confidence
-        if detections:
-            avg_detection_confidence = sum(d['score'] for d in detections) / len(detections)
-            report['confidence_scores']['avg_detection_confidence'] = avg_detection_confidence
+        report['confidence_scores']['avg_detection_confidence'] = float(det_df['score'].mean())
     
     # Process caption
     if results.get('caption'):
@@ -142,18 +236,52 @@ def create_analysis_report(image, results):
     
     return report
 
+@st.cache_data(max_entries=64, show_spinner=False)
+def caption_stats(caption):
+    """Word count, average length, unique words and top-5 frequencies of a caption"""
+    words = caption.split()
+    word_freq = Counter(word.lower().strip('.,!?') for word in words)
+    return {
+        'words': len(words),
+        'avg_len': sum(map(len, words)) / len(words),
+        'unique': len({word.lower() for word in words}),
+        'top5': word_freq.most_common(5)
+    }
+
+class AnalysisFailed(Exception):
+    """Raised when any model fails; carries the partial analysis and per-task errors"""
+    def __init__(self, analysis, errors):
+        super().__init__(errors)
+        self.analysis = analysis
+        self.errors = errors
+
+@st.cache_data(max_entries=32, ttl="1h", show_spinner=False)
+def analyze_upload(image_bytes):
+    """Results and report for an uploaded image, memoized on its content"""
+    image = Image.open(io.BytesIO(image_bytes))
+    
+    # JPEGs decode straight at a reduced DCT scale when the models only need ~800px
+    analysis_image = Image.open(io.BytesIO(image_bytes))
+    scale = min(1, 800 / max(image.size))
+    analysis_image.draft('RGB', (round(image.size[0] * scale), round(image.size[1] * scale)))
+    
+    results, errors = perform_comprehensive_analysis(analysis_image, load_all_models())
+    det_df = detections_frame(results['detection']) if results.get('detection') else None
+    analysis = (results, det_df, create_analysis_report(image, results, det_df))
+    if errors:
+        # Raising keeps a failed run out of the cache so the next click retries
+        raise AnalysisFailed(analysis, errors)
+    return analysis
+
 st.header("🔍 Comprehensive Image Analysis")
 
 uploaded_file = st.file_uploader("Upload an image for complete AI analysis:", 
                                type=['jpg', 'jpeg', 'png', 'bmp'])
 
 if uploaded_file is not None:
-    # Load image
-    image = Image.open(uploaded_file)
-    
-    # Display image
+    # Display the uploaded bytes as-is; decoding is left to the cached analysis
     st.subheader("📷 Input Image")
-    st.image(image, caption="Image for Analysis", use_column_width=True)
+    st.image(uploaded_file.getvalue(), caption="Image for Analysis", use_container_width=True)
     
     # Analysis button
     if st.button("🚀 Perform Complete Analysis", type="primary"):
@@ -167,16 +295,18 @@ if uploaded_file is not None:
             st.info(f"Available AI models: {', '.join(available_models)}")
             
             with st.spinner("🤖 Performing comprehensive AI analysis..."):
-                # Perform analysis
-                results = perform_comprehensive_analysis(image, models)
-                
-                # Generate report
-                report = create_analysis_report(image, results)
+                # Perform analysis and generate report (cached per upload)
+                try:
+                    results, detection_df, report = analyze_upload(uploaded_file.getvalue())
+                except AnalysisFailed as failure:
+                    for task, error in failure.errors.items():
+                        st.error(f"{TASK_NAMES[task]} error: {error}")
+                    results, detection_df, report = failure.analysis
                 
                 # Store in session state
                 st.session_state['analysis_results'] = results
+                st.session_state['detection_df'] = detection_df
                 st.session_state['analysis_report'] = report
-                st.session_state['analyzed_image'] = image
                 
                 st.success("✅ Analysis complete!")
         else:
@@ -186,6 +316,7 @@ if uploaded_file is not None:
 if 'analysis_results' in st.session_state:
     results = st.session_state['analysis_results']
     report = st.session_state['analysis_report']
+    det_df = st.session_state['detection_df']
     
     st.markdown("---")
     st.header("📊 Analysis Dashboard")
@@ -202,7 +333,7 @@ if 'analysis_results' in st.session_state:
             st.metric("Primary Classification", "N/A")
     
     with col2:
-        objects_detected = len(results.get('detection', []))
+        objects_detected = len(results.get('detection') or [])
         st.metric("Objects Detected", objects_detected)
     
     with col3:
@@ -217,9 +348,8 @@ if 'analysis_results' in st.session_state:
         scores = []
         if results.get('classification'):
             scores.append(results['classification'][0]['score'])
-        if results.get('detection'):
-            avg_det_score = sum(d['score'] for d in results['detection']) / len(results['detection'])
-            scores.append(avg_det_score)
+        if det_df is not None:
+            scores.append(det_df['score'].mean())
         
         overall_score = sum(scores) / len(scores) * 100 if scores else 0
         st.metric("Overall Confidence", f"{overall_score:.1f}%")
@@ -261,40 +391,34 @@ if 'analysis_results' in st.session_state:
             st.info("Classification analysis not available.")
     
     with tab2:
-        if results.get('detection'):
+        if det_df is not None:
             st.subheader("🔍 Object Detection Results")
             
-            detections = results['detection']
-            
             # Object summary
-            object_counts = Counter([d['label'] for d in detections])
+            object_counts = det_df['label'].value_counts()
             
             st.write("**Objects Found:**")
-            for obj, count in object_counts.most_common():
+            for obj, count in object_counts.items():
                 st.write(f"• **{obj}**: {count}")
             
             # Detection details
             st.subheader("📋 Detailed Detections")
             
-            detection_data = []
-            for i, detection in enumerate(detections):
-                detection_data.append({
-                    'Object': detection['label'],
-                    'Confidence': f"{detection['score']:.1%}",
-                    'Box Area': (detection['box']['xmax'] - detection['box']['xmin']) * 
-                               (detection['box']['ymax'] - detection['box']['ymin']),
-                    'X': detection['box']['xmin'],
-                    'Y': detection['box']['ymin']
-                })
-            
-            detection_df = pd.DataFrame(detection_data)
-            st.dataframe(detection_df)
+            detection_table = pd.DataFrame({
+                'Object': det_df['label'],
+                'Confidence': det_df['score'].map('{:.1%}'.format),
+                'Box Area': det_df['area'],
+                'X': det_df['xmin'],
+                'Y': det_df['ymin']
+            })
+            st.dataframe(detection_table)
             
             # Object size vs confidence scatter plot
-            if len(detection_data) > 1:
-                fig = px.scatter(detection_df, x='Box Area', y='Confidence',
-                               hover_data=['Object'],
-                               title='Object Size vs Detection Confidence')
+            if len(det_df) > 1:
+                fig = px.scatter(det_df, x='area', y='score',
+                               hover_data=['label'],
+                               title='Object Size vs Detection Confidence',
+                               labels={'area': 'Box Area', 'score': 'Confidence', 'label': 'Object'})
                 st.plotly_chart(fig, use_container_width=True)
         else:
             st.info("Object detection analysis not available.")
@@ -307,24 +431,21 @@ if 'analysis_results' in st.session_state:
             st.info(f"📝 {caption}")
             
             # Caption analysis
-            words = caption.split()
+            stats = caption_stats(caption)
             
             col1, col2, col3 = st.columns(3)
             
             with col1:
-                st.metric("Total Words", len(words))
+                st.metric("Total Words", stats['words'])
             
             with col2:
-                avg_word_length = sum(len(word) for word in words) / len(words)
-                st.metric("Avg Word Length", f"{avg_word_length:.1f}")
+                st.metric("Avg Word Length", f"{stats['avg_len']:.1f}")
             
             with col3:
-                unique_words = len(set(word.lower() for word in words))
-                st.metric("Unique Words", unique_words)
+                st.metric("Unique Words", stats['unique'])
             
             # Word frequency analysis
-            word_freq = Counter(word.lower().strip('.,!?') for word in words)
-            common_words = word_freq.most_common(5)
+            common_words = stats['top5']
             
             st.subheader("📊 Word Frequency Analysis")
             if common_words:
@@ -352,12 +473,11 @@ if 'analysis_results' in st.session_state:
                 'Status': '✅ Success'
             })
         
-        if results.get('detection'):
-            avg_det_conf = sum(d['score'] for d in results['detection']) / len(results['detection'])
+        if det_df is not None:
             performance_data.append({
                 'Model': 'Object Detector',
-                'Primary Result': f"{len(results['detection'])} objects",
-                'Confidence': avg_det_conf,
+                'Primary Result': f"{len(det_df)} objects",
+                'Confidence': det_df['score'].mean(),
                 'Status': '✅ Success'
             })
         
@@ -4,7 +4,7 @@ Check if a number is prime and learn how it works
 """
 
 import streamlit as st
-import math
+from functools import lru_cache
 
 st.set_page_config(page_title="🔢 Prime Checker", page_icon="🔢")
 st.title("🔢 Prime Number Checker")
@@ -12,17 +12,41 @@ st.write("Enter a number to check if it's prime. See the steps and learn the mat
 
 num = st.number_input("Enter a number:", min_value=2, max_value=100000, step=1)
 
+# Only the first few trial divisions are listed, plus the one that decides
+MAX_SHOWN_STEPS = 5
+
+def trial_divisors(n):
+    """2, 3, then 6k±1 up to √n (every other candidate is a multiple of 2 or 3)"""
+    for i in (2, 3):
+        if i * i <= n:
+            yield i
+    i = 5
+    while i * i <= n:
+        yield i
+        if (i + 2) * (i + 2) <= n:
+            yield i + 2
+        i += 6
+
+@lru_cache(maxsize=1024)
 def is_prime(n):
     if n < 2:
-        return False, []
+        return False, ()
     steps = []
-    for i in range(2, int(math.sqrt(n)) + 1):
-        steps.append(f"Check if {n} is divisible by {i}")
-        if n % i == 0:
+    checks = 0
+    for i in trial_divisors(n):
+        checks += 1
+        divisible = n % i == 0
+        if checks <= MAX_SHOWN_STEPS or divisible:
+            if checks > MAX_SHOWN_STEPS + 1:
+                steps.append(f"... {checks - MAX_SHOWN_STEPS - 1} more checks ...")
+            steps.append(f"Check if {n} is divisible by {i}")
+        if divisible:
             steps.append(f"{n} is divisible by {i} (not prime)")
-            return False, steps
+            return False, tuple(steps)
+    if checks > MAX_SHOWN_STEPS:
+        steps.append(f"... {checks - MAX_SHOWN_STEPS} more checks (multiples of 2 and 3 skipped) ...")
     steps.append(f"No divisors found. {n} is prime!")
-    return True, steps
+    return True, tuple(steps)
 
 if st.button("Check Prime"):
     prime, steps = is_prime(num)
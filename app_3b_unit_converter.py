@@ -4,35 +4,32 @@ Convert between common units interactively
 """
 
 import streamlit as st
+import numpy as np
 
 st.set_page_config(page_title="🔄 Unit Converter", page_icon="🔄")
 st.title("🔄 Unit Converter")
 st.write("Convert length, mass, and temperature units easily!")
 
+UNITS = {
+    "Length": ("meters", "kilometers", "miles", "feet"),
+    "Mass": ("grams", "kilograms", "pounds", "ounces"),
+}
+
+# Size of each unit in the category's base unit (meters, grams)
+TO_BASE = {
+    "Length": np.array([1, 1000, 1609.344, 0.3048]),
+    "Mass": np.array([1, 1000, 453.59237, 28.349523125]),
+}
+
+# FACTORS[category][i, j] converts unit i to unit j, for every pair
+FACTORS = {c: to_base[:, None] / to_base[None, :] for c, to_base in TO_BASE.items()}
+
 category = st.selectbox("Choose category:", ["Length", "Mass", "Temperature"])
 
-if category == "Length":
-    units = ["meters", "kilometers", "miles", "feet"]
-    factors = {
-        ("meters", "kilometers"): 0.001,
-        ("meters", "miles"): 0.000621371,
-        ("meters", "feet"): 3.28084,
-        ("kilometers", "meters"): 1000,
-        ("miles", "meters"): 1609.34,
-        ("feet", "meters"): 0.3048,
-    }
-elif category == "Mass":
-    units = ["grams", "kilograms", "pounds", "ounces"]
-    factors = {
-        ("grams", "kilograms"): 0.001,
-        ("grams", "pounds"): 0.00220462,
-        ("grams", "ounces"): 0.035274,
-        ("kilograms", "grams"): 1000,
-        ("pounds", "grams"): 453.592,
-        ("ounces", "grams"): 28.3495,
-    }
-elif category == "Temperature":
+if category == "Temperature":
     units = ["Celsius", "Fahrenheit", "Kelvin"]
+else:
+    units = list(UNITS[category])
 
 from_unit = st.selectbox("From:", units)
 to_unit = st.selectbox("To:", units)
@@ -56,14 +53,7 @@ if st.button("Convert"):
         elif from_unit == "Kelvin" and to_unit == "Fahrenheit":
             result = (value - 273.15) * 9/5 + 32
     else:
-        if from_unit == to_unit:
-            result = value
-        else:
-            key = (from_unit, to_unit)
-            if key in factors:
-                result = value * factors[key]
-            else:
-                st.error("Conversion not supported.")
+        result = value * float(FACTORS[category][units.index(from_unit), units.index(to_unit)])
     if result is not None:
         st.success(f"{value} {from_unit} = {result} {to_unit}")
 
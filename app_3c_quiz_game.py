@@ -4,6 +4,7 @@ Test your knowledge with a multiple-choice quiz!
 """
 
 import streamlit as st
+import numpy as np
 
 st.set_page_config(page_title="🧠 Quiz Game", page_icon="🧠")
 st.title("🧠 Quiz Game")
@@ -32,19 +33,25 @@ questions = [
     },
 ]
 
-score = 0
-user_answers = []
+# Correct answers as one array, compared against the submission in a single step
+ANSWERS = np.array([q["answer"] for q in questions])
 
-for idx, q in enumerate(questions):
-    st.subheader(f"Q{idx+1}: {q['question']}")
-    user_answer = st.radio("Choose your answer:", q["options"], key=f"q{idx}")
-    user_answers.append(user_answer)
+# Choices live in a form so picking an option doesn't rerun the script
+with st.form("quiz"):
+    user_answers = []
+    for idx, q in enumerate(questions):
+        st.subheader(f"Q{idx+1}: {q['question']}")
+        user_answer = st.radio("Choose your answer:", q["options"], key=f"q{idx}")
+        user_answers.append(user_answer)
+    
+    submitted = st.form_submit_button("Submit Answers")
 
-if st.button("Submit Answers"):
-    score = sum([user_answers[i] == questions[i]["answer"] for i in range(len(questions))])
+if submitted:
+    correct = np.array(user_answers) == ANSWERS
+    score = int(correct.sum())
     st.success(f"Your score: {score} / {len(questions)}")
     for i, q in enumerate(questions):
-        if user_answers[i] == q["answer"]:
+        if correct[i]:
             st.write(f"Q{i+1}: Correct!")
         else:
             st.write(f"Q{i+1}: Incorrect. Correct answer: {q['answer']}")
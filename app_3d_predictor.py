@@ -5,27 +5,33 @@ Predict outcomes using basic AI models
 
 import streamlit as st
 import random
-from sklearn.linear_model import LinearRegression
 import numpy as np
 
 st.set_page_config(page_title="🔮 Predictor", page_icon="🔮")
 st.title("🔮 Simple Predictor")
 st.write("Enter numbers and let AI predict the next value!")
 
+@st.cache_data(max_entries=256, show_spinner=False)
+def predict_next(nums, degree=1):
+    """Least-squares polynomial fit over the positions, evaluated at the next one"""
+    x = np.arange(len(nums), dtype=np.float64)
+    coeffs = np.polyfit(x, nums, degree)
+    return float(np.polyval(coeffs, len(nums)))
+
 st.markdown("Enter a sequence of numbers (e.g. 2, 4, 6, 8):")
 seq = st.text_input("Sequence:")
 
 if seq:
     nums = [float(x.strip()) for x in seq.split(",") if x.strip()]
     if len(nums) >= 2:
-        X = np.arange(len(nums)).reshape(-1, 1)
-        y = np.array(nums)
-        model = LinearRegression()
-        model.fit(X, y)
-        next_idx = len(nums)
-        pred = model.predict(np.array([[next_idx]]))[0]
+        # Longer sequences have enough points to fit a curve
+        degree = st.slider("Polynomial degree:", 1, 3, 1) if len(nums) >= 5 else 1
+        pred = predict_next(tuple(nums), degree)
         st.success(f"Predicted next value: {pred:.2f}")
-        st.write("(Uses linear regression to predict the next value in your sequence)")
+        if degree == 1:
+            st.write("(Uses linear regression to predict the next value in your sequence)")
+        else:
+            st.write(f"(Uses degree-{degree} polynomial regression to predict the next value in your sequence)")
     else:
         st.warning("Enter at least 2 numbers for prediction.")
 
@@ -4,44 +4,93 @@ Add, view, and delete records in a JSON file
 """
 
 import streamlit as st
-import json
+import orjson
 import os
 
 st.set_page_config(page_title="🗄️ Simple JSON Database", page_icon="🗄️")
 st.title("🗄️ Simple JSON Database")
 
-DB_FILE = "my_db.json"
+# Append-only log: one JSON record per line, deletes appended as tombstones
+DB_FILE = "my_db.ndjson"
+LEGACY_DB_FILE = "my_db.json"
+DELETE_MARKER = b"#DEL "
 
-# Load database
-if os.path.exists(DB_FILE):
-    with open(DB_FILE, "r", encoding="utf-8") as f:
-        try:
-            db = json.load(f)
-        except Exception:
-            db = []
-else:
-    db = []
+def import_legacy_db():
+    # One-time conversion of the old JSON array file
+    try:
+        with open(LEGACY_DB_FILE, "rb") as f:
+            legacy = orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        legacy = []
+    with open(DB_FILE, "wb") as f:
+        f.writelines(orjson.dumps(record) + b"\n" for record in legacy)
+
+# Parsed once and shared by every rerun until a write clears it
+@st.cache_data(show_spinner=False)
+def load_db():
+    """Replay the log into {line number: record}, skipping deleted records"""
+    if not os.path.exists(DB_FILE):
+        import_legacy_db()
+    
+    records = {}
+    record_lines = deleted = 0
+    with open(DB_FILE, "rb") as f:
+        for line in f:
+            if line.startswith(DELETE_MARKER):
+                records.pop(int(line[len(DELETE_MARKER):]), None)
+                deleted += 1
+            elif line.strip():
+                try:
+                    records[record_lines] = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    pass
+                record_lines += 1
+    return records, record_lines, deleted
+
+def append_line(line):
+    with open(DB_FILE, "ab") as f:
+        f.write(line + b"\n")
+
+def compact_db(records):
+    # Rewrite only the live records once tombstones make up most of the file
+    tmp_file = DB_FILE + ".tmp"
+    with open(tmp_file, "wb") as f:
+        f.writelines(orjson.dumps(record) + b"\n" for record in records)
+    os.replace(tmp_file, DB_FILE)
+
+db, record_lines, deleted = load_db()
 
 name = st.text_input("Name")
 age = st.number_input("Age", min_value=0, max_value=120, step=1)
 email = st.text_input("Email")
 
 if st.button("Add Record"):
-    db.append({"name": name, "age": age, "email": email})
-    with open(DB_FILE, "w", encoding="utf-8") as f:
-        json.dump(db, f, indent=2)
+    append_line(orjson.dumps({"name": name, "age": age, "email": email}))
+    load_db.clear()
     st.success(f"Added record for {name}")
     st.rerun()
 
 st.header("Records")
 if db:
-    for i, record in enumerate(db):
-        st.write(f"{record}")
-        if st.button(f"Delete {record['name']}", key=f"del_{i}"):
-            db.pop(i)
-            with open(DB_FILE, "w", encoding="utf-8") as f:
-                json.dump(db, f, indent=2)
-            st.warning(f"Deleted record {record['name']}")
+    # Deletes are ticked in a form and applied together on one submit
+    with st.form("records"):
+        for line_no, record in db.items():
+            st.write(f"{record}")
+            st.checkbox(f"Delete {record['name']}", key=f"del_{line_no}")
+        apply_deletes = st.form_submit_button("Apply Deletes")
+    
+    if apply_deletes:
+        to_delete = {n for n in db if st.session_state[f"del_{n}"]}
+        if to_delete:
+            if (deleted + len(to_delete)) * 2 > record_lines:
+                compact_db(r for n, r in db.items() if n not in to_delete)
+            else:
+                append_line(b"\n".join(DELETE_MARKER + str(n).encode() for n in sorted(to_delete)))
+            load_db.clear()
+            # Compaction renumbers lines, so don't carry ticks over to other records
+            for n in db:
+                del st.session_state[f"del_{n}"]
+            st.warning(f"Deleted {len(to_delete)} record(s)")
             st.rerun()
 else:
     st.info("No records yet.")
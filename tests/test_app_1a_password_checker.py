@@ -0,0 +1,15 @@
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+APP = str(Path(__file__).resolve().parent.parent / "app_1a_password_checker.py")
+
+
+def test_password_is_scored():
+    at = AppTest.from_file(APP).run()
+    at.text_input[0].input("correct horse battery staple 42!")
+    at.button[0].click().run()
+
+    assert not at.exception
+    assert at.metric[0].label == "Strength Score"
+    assert at.metric[0].value == "4/4"
@@ -1,7 +1,9 @@
 import streamlit as st
-import json
+import orjson
+import os
+import re
+import numpy as np
 from datetime import datetime
-from textblob import TextBlob
 
 st.sidebar.markdown("---")
 st.sidebar.write("🎓 **Workshop Topics Covered:**")
@@ -10,19 +12,92 @@ st.sidebar.write("• AI Sentiment Analysis")
 st.sidebar.write("• Phishing Detection")
 st.sidebar.write("• Data Visualization")
 
+# Append-only log: one JSON email per line
+DB_PATH = "workshop_database.ndjson"
+LEGACY_DB_PATH = "workshop_database.json"
+
+def import_legacy_db():
+    # One-time conversion of the old JSON array file
+    try:
+        with open(LEGACY_DB_PATH, "rb") as f:
+            legacy = orjson.loads(f.read())
+    except FileNotFoundError:
+        return
+    # Encode once, write once, and swap in so a crash never leaves half a log
+    data = b"".join(orjson.dumps(email) + b"\n" for email in legacy)
+    tmp_path = DB_PATH + ".tmp"
+    with open(tmp_path, "wb", buffering=0) as f:
+        f.write(data)
+    os.replace(tmp_path, DB_PATH)
+
+# Keyed on the file's mtime so reruns skip the disk until the file changes
+@st.cache_data(show_spinner=False)
+def _load(mtime):
+    emails = []
+    with open(DB_PATH, "rb") as f:
+        for line in f:
+            if line.strip():
+                try:
+                    emails.append(orjson.loads(line))
+                except orjson.JSONDecodeError:
+                    # A crash mid-append leaves a torn line; skip it rather than fail every rerun
+                    pass
+    return emails
+
 def save_load_emails():
+    if not os.path.exists(DB_PATH):
+        import_legacy_db()
     try:
-        with open("workshop_database.json", "r") as f:
-            return json.load(f)
-    except:
+        mtime = os.path.getmtime(DB_PATH)
+    except OSError:
         return []
-
-def save_emails(emails):
-    with open("workshop_database.json", "w") as f:
-        json.dump(emails, f)
-
+    return _load(mtime)
+
+def append_email(email):
+    line = orjson.dumps(email) + b"\n"
+    with open(DB_PATH, "a+b", buffering=0) as f:
+        # Start on a fresh line if a torn write left the log without a trailing newline
+        end = f.seek(0, os.SEEK_END)
+        if end:
+            f.seek(end - 1)
+            if f.read(1) != b"\n":
+                line = b"\n" + line
+        # Single unbuffered write of the whole line
+        f.write(line)
+    _load.clear()
+
+# Label order used for the numeric codes in the stats side-table
+SENTIMENTS = ("😊 Positive", "😐 Neutral", "😔 Negative")
+SECURITY_LEVELS = ("✅ Looks Safe", "⚠️ Be Careful", "🚨 Possible Phishing")
+SENTIMENT_CODES = {label: code for code, label in enumerate(SENTIMENTS)}
+SECURITY_CODES = {label: code for code, label in enumerate(SECURITY_LEVELS)}
+
+PHISHING_WORDS = (
+    "urgent",
+    "click now",
+    "verify account",
+    "suspended",
+    "limited time",
+    "act now",
+    "money",
+    "free",
+)
+# Whole words only ("freedom" is not "free"), any whitespace between words
+PHISHING_RE = re.compile(
+    r"\b(?:" + "|".join(re.escape(word).replace(r"\ ", r"\s+") for word in PHISHING_WORDS) + r")\b",
+    re.IGNORECASE
+)
+
+@st.cache_resource(show_spinner="Loading sentiment analyzer...")
+def load_sentiment_analyzer():
+    """One VADER analyzer per process; its lexicon is read once at construction"""
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    return SentimentIntensityAnalyzer()
+
+# Identical messages skip sentiment scoring entirely
+@st.cache_data(max_entries=1024, show_spinner=False)
 def ai_check(text):
-    scores = TextBlob(text).sentiment.polarity
+    scores = load_sentiment_analyzer().polarity_scores(text)["compound"]
 
     if scores >= 0.05:
         sentiment = "😊 Positive"
@@ -31,17 +106,8 @@ def ai_check(text):
     else:
         sentiment = "😐 Neutral"
 
-    phishing_words = [
-        "urgent",
-        "click now",
-        "verify account",
-        "suspended",
-        "limited time",
-        "act now",
-        "money",
-        "free"
-    ]
-    phishing_count = sum(1 for word in phishing_words if word.lower() in text.lower())
+    # Distinct phishing phrases found, in one case-insensitive pass
+    phishing_count = len({" ".join(match.lower().split()) for match in PHISHING_RE.findall(text)})
 
     if phishing_count >= 2:
         security = "🚨 Possible Phishing"
@@ -52,11 +118,27 @@ def ai_check(text):
 
     return sentiment, security, scores
 
+INBOX_PAGE_SIZE = 20
+
 st.title("📧 Email Analysis Workshop")
 st.write("Learn Python with AI-powered email analysis!")
 
 emails = save_load_emails()
 
+# Columnar scores and label codes for the stats tab, rebuilt only when the log
+# changed outside this session
+db_mtime = os.path.getmtime(DB_PATH) if os.path.exists(DB_PATH) else None
+if "stats_mtime" not in st.session_state or st.session_state["stats_mtime"] != db_mtime:
+    # One pass over the emails fills all three columns
+    columns = np.array(
+        [(e["score"], SENTIMENT_CODES[e["sentiment"]], SECURITY_CODES[e["security"]]) for e in emails],
+        np.float32
+    ).reshape(-1, 3)
+    st.session_state["scores"] = columns[:, 0].copy()
+    st.session_state["sentiment_codes"] = columns[:, 1].astype(np.uint8)
+    st.session_state["security_codes"] = columns[:, 2].astype(np.uint8)
+    st.session_state["stats_mtime"] = db_mtime
+
 tab1, tab2, tab3 = st.tabs(["✍️ Write Email", "📥 Inbox", "📊 Stats"])
 
 with tab1:
@@ -67,7 +149,8 @@ with tab1:
 
     if st.button("📤 Send Email"):
         if subject and message:
-            sentiment, security, score = ai_check(message)
+            with st.spinner("🤖 Analyzing email..."):
+                sentiment, security, score = ai_check(message)
             
             email = {
                 "subject": subject,
@@ -78,8 +161,12 @@ with tab1:
                 "score": score,
             }
 
+            append_email(email)
             emails.append(email)
-            save_emails(emails)
+            st.session_state["scores"] = np.append(st.session_state["scores"], np.float32(score))
+            st.session_state["sentiment_codes"] = np.append(st.session_state["sentiment_codes"], np.uint8(SENTIMENT_CODES[sentiment]))
+            st.session_state["security_codes"] = np.append(st.session_state["security_codes"], np.uint8(SECURITY_CODES[security]))
+            st.session_state["stats_mtime"] = os.path.getmtime(DB_PATH)
 
             st.success("✅ Email sent!")
             st.info(f"AI Analysis: {sentiment} | {security}")
@@ -90,7 +177,12 @@ with tab2:
     st.header("Email Inbox")
 
     if emails:
-        for i, email in enumerate(reversed(emails)):
+        # Only one page of expanders is built per rerun, newest first
+        pages = (len(emails) + INBOX_PAGE_SIZE - 1) // INBOX_PAGE_SIZE
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1) - 1
+        end = len(emails) - page * INBOX_PAGE_SIZE
+        start = max(0, end - INBOX_PAGE_SIZE)
+        for email in reversed(emails[start:end]):
             with st.expander(f"📧 {email['subject']} - {email['timestamp']}"):
                 st.write(f"**Message:** {email['message']}")
                 st.write(f"**AI Sentiment:** {email['sentiment']}")
@@ -102,9 +194,7 @@ with tab3:
     st.header("Email Statistics")
 
     if emails:
-        positive = sum(1 for e in emails if "😊" in e["sentiment"])
-        negative = sum(1 for e in emails if "😔" in e["sentiment"])
-        neutral = sum(1 for e in emails if "😐" in e["sentiment"])
+        positive, neutral, negative = np.bincount(st.session_state["sentiment_codes"], minlength=3).tolist()
 
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -123,13 +213,11 @@ with tab3:
             }
             st.bar_chart(chart_data, x="Sentiment", y="Count")
         with col2:
-            scores = [email["score"] for email in emails]
-            score_data = {"Email Index": range(len(scores)), "Sentiment Score": scores}
+            scores = st.session_state["scores"]
+            score_data = {"Email Index": np.arange(len(scores), dtype=np.int32), "Sentiment Score": scores}
             st.line_chart(score_data, x="Email Index", y="Sentiment Score")
 
-        safe = sum(1 for e in emails if "✅" in e["security"])
-        warning = sum(1 for e in emails if "⚠️" in e["security"])
-        phishing = sum(1 for e in emails if "🚨" in e["security"])
+        safe, warning, phishing = np.bincount(st.session_state["security_codes"], minlength=3).tolist()
 
         st.subheader("Security Analysis")
         col1, col2, col3 = st.columns(3)